@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -38,10 +40,21 @@ class SnowflakeSettings(BaseSettings):
     )
 
 
-
 class PrefectSettings(BaseSettings):
     api_url: str
 
     model_config = SettingsConfigDict(
         env_prefix="PREFECT_", env_file=".env", extra="ignore"
     )
+
+
+@lru_cache(maxsize=1)
+def get_minio_settings() -> MinIOSettings:
+    """Resolve MinIO settings once per process; reruns and retries reuse it."""
+    return MinIOSettings()
+
+
+@lru_cache(maxsize=1)
+def get_snowflake_settings() -> SnowflakeSettings:
+    """Resolve Snowflake settings once per process; reruns and retries reuse it."""
+    return SnowflakeSettings()
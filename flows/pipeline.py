@@ -1,10 +1,9 @@
 import os
-import tempfile
 from pathlib import Path
 
 from prefect import flow
 
-from config.settings import MinIOSettings, SnowflakeSettings
+from config.settings import get_minio_settings, get_snowflake_settings
 from flows.load import (
     infer_schema,
     create_parent_table,
@@ -12,15 +11,19 @@ from flows.load import (
     load_data,
 )
 from utils.minio_helpers import download_from_minio, upload_to_minio
-from utils.validators import validate_row_count, sample_rows
+from utils.schema_cache import csv_fingerprint
+from utils.snowflake_helpers import SnowflakeHelper
+from utils.temp_files import stage_tempdir
+from utils.validators import validate_and_sample_rows
 
 
-def resolve_load_inputs(csv_file: str | None) -> tuple[str, str]:
+def resolve_load_inputs(csv_file: str | None) -> tuple[str, str, str]:
     """Derive deterministic object naming for idempotent local upload/download runs."""
     if not csv_file:
         raise ValueError("csv_file is required.")
-    object_name = f"uploads/{Path(csv_file).name}"
-    return object_name, csv_file
+    basename = Path(csv_file).name
+    object_name = f"uploads/{basename}"
+    return object_name, csv_file, basename
 
 
 def validate_merge_key(column_types: dict[str, str], merge_key: str = "id") -> None:
@@ -43,40 +46,50 @@ def etl_pipeline(
     - Requires `id` in inferred schema for deterministic merge semantics.
     - Returns run metadata consumed by CLI summary and operational validation.
     """
-    minio_cfg = MinIOSettings()
-    sf_cfg = SnowflakeSettings()
-
-    object_name, local_csv = resolve_load_inputs(csv_file)
-    upload_to_minio(local_csv, object_name, minio_cfg)
-
-    # Persist to a named temp file so Snowflake PUT can read a stable local path.
-    tmp_file = tempfile.NamedTemporaryFile(
-        suffix=f"_{Path(object_name).name}",
-        prefix="etl_",
-        delete=False,
-    )
-    tmp_file.close()
-    local_path = tmp_file.name
-    try:
-        df = download_from_minio(object_name, local_path, minio_cfg)
-        column_types = infer_schema(df)
-
-        validate_merge_key(column_types)
-        create_parent_table(table_name, column_types, sf_cfg)
+    minio_cfg = get_minio_settings()
+    sf_cfg = get_snowflake_settings()
 
+    object_name, local_csv, basename = resolve_load_inputs(csv_file)
+
+    # One Snowflake login per flow run: every task below reuses this session.
+    with SnowflakeHelper(sf_cfg).session() as sf_conn:
+        # Stage setup is schema-independent; overlap its round-trip with MinIO I/O.
         stage_name = "local_stage"
-        setup_internal_stage(stage_name, sf_cfg)
-
-        merge_result = load_data(
-            table_name,
-            stage_name,
-            local_path,
-            column_types,
-            sf_cfg,
-        )
+        stage_future = setup_internal_stage.submit(stage_name, sf_cfg, conn=sf_conn)
 
-        validate_row_count(table_name, expected_min=1, sf_config=sf_cfg)
-        sample_rows(table_name, limit=5, sf_config=sf_cfg)
+        try:
+            upload_to_minio(local_csv, object_name, minio_cfg)
+
+            # The single local copy feeds the fingerprint, the inference sample,
+            # and PUT; streaming PUT from memory would buffer the whole object.
+            # Its directory is removed in a batch at interpreter exit.
+            with stage_tempdir() as tmp_dir:
+                local_path = os.path.join(tmp_dir, basename)
+                download_from_minio(object_name, local_path, minio_cfg)
+                column_types = infer_schema(local_path, csv_fingerprint(local_path))
+
+                validate_merge_key(column_types)
+                create_parent_table(table_name, column_types, sf_cfg, conn=sf_conn)
+
+                # The stage must exist before staging data through it.
+                stage_future.result()
+
+                merge_result = load_data(
+                    table_name,
+                    stage_name,
+                    local_path,
+                    column_types,
+                    sf_cfg,
+                    conn=sf_conn,
+                )
+        finally:
+            # A failing session scope closes its connection; never leave it
+            # while stage setup may still be running on it in a worker thread.
+            stage_future.wait()
+
+        validate_and_sample_rows(
+            table_name, expected_min=1, limit=5, sf_config=sf_cfg, conn=sf_conn
+        )
 
         return {
             "table": table_name,
@@ -85,12 +98,6 @@ def etl_pipeline(
             "updated": merge_result["updated"],
             "validation_passed": True,
             "object_name": object_name,
-            "input_file": str(Path(local_csv).name),
+            "input_file": basename,
             "column_count": len(column_types),
         }
-    finally:
-        try:
-            # Always clean local temp artifacts, even when downstream tasks fail.
-            os.remove(local_path)
-        except FileNotFoundError:
-            pass
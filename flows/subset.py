@@ -1,13 +1,91 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Annotated, Any
 
 from prefect import flow
+from pydantic import (
+    BaseModel,
+    Discriminator,
+    StringConstraints,
+    Tag,
+    TypeAdapter,
+    ValidationError,
+)
 import yaml
 
-from config.settings import SnowflakeSettings
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+from config.settings import get_snowflake_settings
 from utils.snowflake_helpers import SnowflakeHelper
 
 
+_NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+class FlattenItem(BaseModel):
+    path: _NonEmptyStr
+    type: str | None = "VARCHAR"
+
+
+def _flatten_kind(item: Any) -> str | None:
+    if isinstance(item, str):
+        return "str"
+    if isinstance(item, (dict, FlattenItem)):
+        return "object"
+    return None
+
+
+_FlattenEntry = Annotated[
+    Annotated[_NonEmptyStr, Tag("str")] | Annotated[FlattenItem, Tag("object")],
+    Discriminator(
+        _flatten_kind,
+        custom_error_type="flatten_item",
+        custom_error_message="must be a string or an object",
+    ),
+]
+
+
+class Filter(BaseModel):
+    name: _NonEmptyStr
+    where: _NonEmptyStr
+    flatten: list[_FlattenEntry] | None = None
+
+
+class SubsetsConfig(BaseModel):
+    source_table: _NonEmptyStr = "events"
+    filters: list[Filter] = []
+
+
+# Built once at import so each run is a single compiled pydantic-core call.
+_SUBSETS_VALIDATOR = TypeAdapter(SubsetsConfig)
+_UNION_TAGS = frozenset({"str", "object"})
+
+
+def _format_error_location(loc: tuple[int | str, ...]) -> str:
+    """Render pydantic error locations as `filters[0].flatten[1].path`."""
+    path = ""
+    for part in loc:
+        if isinstance(part, int):
+            path += f"[{part}]"
+        elif part not in _UNION_TAGS:
+            path += f".{part}" if path else part
+    return path or "Subset config"
+
+
+@lru_cache(maxsize=8)
+def _parse_subsets_file(path: str, mtime_ns: int) -> Any:
+    # mtime is part of the cache key so edits to the file are picked up.
+    return yaml.load(Path(path).read_text(), Loader=_YamlLoader)
+
+
+def _load_subsets(path: Path) -> Any:
+    """Parse subset YAML once per file revision."""
+    return _parse_subsets_file(str(path), path.stat().st_mtime_ns)
+
+
 def _validate_subsets_config(
     config: dict[str, Any],
 ) -> tuple[str, list[dict[str, Any]]]:
@@ -15,63 +93,17 @@ def _validate_subsets_config(
     if not isinstance(config, dict):
         raise ValueError("Subset config must be a YAML object.")
 
-    source_table = config.get("source_table", "events")
-    if not isinstance(source_table, str) or not source_table.strip():
-        raise ValueError("`source_table` must be a non-empty string.")
-
-    filters = config.get("filters", [])
-    if not isinstance(filters, list):
-        raise ValueError("`filters` must be a list.")
-
-    validated_filters: list[dict[str, Any]] = []
-    for idx, filter_def in enumerate(filters):
-        if not isinstance(filter_def, dict):
-            raise ValueError(f"filters[{idx}] must be an object.")
-
-        name = filter_def.get("name")
-        where = filter_def.get("where")
-        flatten = filter_def.get("flatten", [])
-
-        if not isinstance(name, str) or not name.strip():
-            raise ValueError(f"filters[{idx}].name must be a non-empty string.")
-        if not isinstance(where, str) or not where.strip():
-            raise ValueError(f"filters[{idx}].where must be a non-empty string.")
-
-        if flatten is None:
-            flatten = []
-        if not isinstance(flatten, list):
-            raise ValueError(f"filters[{idx}].flatten must be a list when provided.")
-
-        for jdx, item in enumerate(flatten):
-            if isinstance(item, str):
-                if not item.strip():
-                    raise ValueError(f"filters[{idx}].flatten[{jdx}] cannot be empty.")
-                continue
-            if isinstance(item, dict):
-                path = item.get("path")
-                dtype = item.get("type", "VARCHAR")
-                if not isinstance(path, str) or not path.strip():
-                    raise ValueError(
-                        f"filters[{idx}].flatten[{jdx}].path must be a non-empty string."
-                    )
-                if dtype is not None and not isinstance(dtype, str):
-                    raise ValueError(
-                        f"filters[{idx}].flatten[{jdx}].type must be a string when provided."
-                    )
-                continue
-            raise ValueError(
-                f"filters[{idx}].flatten[{jdx}] must be a string or an object."
-            )
-
-        validated_filters.append(
-            {
-                "name": name.strip(),
-                "where": where.strip(),
-                "flatten": flatten,
-            }
-        )
+    try:
+        validated = _SUBSETS_VALIDATOR.validate_python(config).model_dump()
+    except ValidationError as exc:
+        # Report the most specific failure; union branches add shallower noise.
+        error = max(exc.errors(), key=lambda err: len(err["loc"]))
+        location = _format_error_location(error["loc"])
+        raise ValueError(f"{location}: {error['msg']}") from None
 
-    return source_table.strip(), validated_filters
+    for filter_def in validated["filters"]:
+        filter_def["flatten"] = filter_def["flatten"] or []
+    return validated["source_table"], validated["filters"]
 
 
 @flow(name="create-subsets")
@@ -83,24 +115,31 @@ def create_subsets():
     shape validation. This function does not sanitize SQL expressions.
     """
 
-    sf_cfg = SnowflakeSettings()
-    helper = SnowflakeHelper(sf_cfg)
-
     config_path = Path("config/subsets.yml")
-    config = yaml.safe_load(config_path.read_text()) or {}
+    config = _load_subsets(config_path) or {}
     source_table, filters = _validate_subsets_config(config)
-    created = []
-
-    for filter_def in filters:
-        helper.create_secure_view(
-            view_name=filter_def["name"],
-            source_table=source_table,
-            where_clause=filter_def["where"],
-            flatten_columns=filter_def.get("flatten"),
-        )
-
-        print(f"View created: {filter_def['name']}")
-        created.append(filter_def["name"])
+    if not filters:
+        return []
+
+    # Resolve Snowflake settings only once there is DDL to run, so config
+    # errors and empty configs never depend on connection env vars.
+    helper = SnowflakeHelper(get_snowflake_settings())
+
+    # One multi-statement submission; views over the same source table share
+    # a single cached column lookup.
+    created = helper.create_secure_views_bulk(
+        [
+            {
+                "view_name": filter_def["name"],
+                "source_table": source_table,
+                "where_clause": filter_def["where"],
+                "flatten_columns": filter_def.get("flatten"),
+            }
+            for filter_def in filters
+        ]
+    )
+    for view_name in created:
+        print(f"View created: {view_name}")
 
     return created
 
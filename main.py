@@ -1,9 +1,5 @@
 import argparse
 
-from flows.pipeline import etl_pipeline
-from flows.subset import create_subsets
-from utils.validators import summarize_run
-
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run ETL pipeline")
@@ -24,6 +20,11 @@ def main() -> None:
     parser.set_defaults(run_subsets=True)
     args = parser.parse_args()
 
+    # Deferred so `--help` and argument errors skip Prefect/pandas/MinIO imports.
+    from flows.pipeline import etl_pipeline
+    from flows.subset import create_subsets
+    from utils.validators import summarize_run
+
     result = etl_pipeline(
         args.csv,
         table_name=args.table,
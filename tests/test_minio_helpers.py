@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+from minio.error import S3Error
+
+import utils.minio_helpers as minio_helpers
+
+
+def _s3_error(code: str) -> S3Error:
+    return S3Error(None, code, "message", "resource", "request-id", "host-id")
+
+
+class FakeMinio:
+    def __init__(self, make_bucket_error: S3Error | None = None):
+        self.make_bucket_calls = 0
+        self.make_bucket_error = make_bucket_error
+
+    def make_bucket(self, _bucket: str) -> None:
+        self.make_bucket_calls += 1
+        if self.make_bucket_error is not None:
+            raise self.make_bucket_error
+
+
+@pytest.fixture(autouse=True)
+def reset_ensured_buckets(monkeypatch):
+    monkeypatch.setattr(minio_helpers, "_ensured_buckets", set())
+
+
+def test_ensure_bucket_creates_once_per_process() -> None:
+    client = FakeMinio()
+
+    minio_helpers._ensure_bucket(client, "localhost:9000", "raw")
+    minio_helpers._ensure_bucket(client, "localhost:9000", "raw")
+
+    assert client.make_bucket_calls == 1
+
+
+def test_ensure_bucket_tolerates_existing_bucket() -> None:
+    client = FakeMinio(_s3_error("BucketAlreadyOwnedByYou"))
+
+    minio_helpers._ensure_bucket(client, "localhost:9000", "raw")
+    minio_helpers._ensure_bucket(client, "localhost:9000", "raw")
+
+    assert client.make_bucket_calls == 1
+
+
+def test_ensure_bucket_propagates_other_errors() -> None:
+    client = FakeMinio(_s3_error("AccessDenied"))
+
+    with pytest.raises(S3Error):
+        minio_helpers._ensure_bucket(client, "localhost:9000", "raw")
+    assert ("localhost:9000", "raw") not in minio_helpers._ensured_buckets
+
+
+def test_client_is_shared_per_credential_set() -> None:
+    cfg = SimpleNamespace(
+        endpoint="localhost:9000",
+        access_key="minioadmin",
+        secret_key="minioadmin",
+        secure=False,
+    )
+    other = SimpleNamespace(**{**vars(cfg), "access_key": "other"})
+
+    assert minio_helpers._client_for(cfg) is minio_helpers._client_for(cfg)
+    assert minio_helpers._client_for(cfg) is not minio_helpers._client_for(other)
@@ -1,24 +1,56 @@
+from contextlib import contextmanager
+import os
 from types import SimpleNamespace
 
-import pandas as pd
+import pytest
 
 import flows.pipeline as pipeline
+import utils.temp_files as temp_files
+
+
+class FakeTask:
+    """Stand-in for a Prefect task that supports both direct calls and `.submit()`."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.waited = 0
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def submit(self, *args, **kwargs):
+        result = self.fn(*args, **kwargs)
+        return SimpleNamespace(result=lambda: result, wait=self._wait)
+
+    def _wait(self) -> None:
+        self.waited += 1
+
+
+class FakeSnowflakeHelper:
+    connection = object()
+
+    def __init__(self, _config):
+        pass
+
+    @contextmanager
+    def session(self, conn=None):
+        yield conn or self.connection
 
 
 def test_pipeline_smoke_with_mocked_dependencies(monkeypatch, tmp_path) -> None:
+    # Every consumer of the CSV is mocked, so no file needs to exist on disk.
     csv_path = tmp_path / "events.csv"
-    csv_path.write_text(
-        "id,name,country,event_type,event_date,event_metadata\n"
-        '1,Ana,ES,signup,2025-01-03,"{""user_id"": 789, ""session_duration"": 30}"\n',
-        encoding="utf-8",
-    )
 
     calls: dict[str, object] = {}
 
-    monkeypatch.setattr(pipeline, "MinIOSettings", lambda: SimpleNamespace())
+    monkeypatch.setattr(temp_files, "STAGE_ROOT", tmp_path / "stage")
+    monkeypatch.setattr(temp_files, "_pending_dirs", set())
+    monkeypatch.setattr(temp_files, "_stale_sweep_started", True)
+
+    monkeypatch.setattr(pipeline, "get_minio_settings", lambda: SimpleNamespace())
     monkeypatch.setattr(
         pipeline,
-        "SnowflakeSettings",
+        "get_snowflake_settings",
         lambda: SimpleNamespace(database="ETL_DB", schema_="PUBLIC"),
     )
 
@@ -28,9 +60,10 @@ def test_pipeline_smoke_with_mocked_dependencies(monkeypatch, tmp_path) -> None:
 
     def fake_download_from_minio(object_name, output_path, _minio_cfg):
         calls["download"] = (object_name, output_path)
-        return pd.read_csv(csv_path)
+        return output_path
 
-    def fake_infer_schema(_df):
+    def fake_infer_schema(local_path, fingerprint):
+        calls["infer"] = (local_path, fingerprint)
         return {
             "id": "NUMBER",
             "name": "VARCHAR",
@@ -40,24 +73,33 @@ def test_pipeline_smoke_with_mocked_dependencies(monkeypatch, tmp_path) -> None:
             "event_metadata": "VARIANT",
         }
 
-    def fake_create_parent_table(table_name, _column_types, _sf_cfg):
-        calls["table"] = table_name
+    def fake_create_parent_table(table_name, _column_types, _sf_cfg, conn=None):
+        calls["table"] = (table_name, conn)
 
-    def fake_setup_internal_stage(stage_name, _sf_cfg):
-        calls["stage"] = stage_name
+    def fake_setup_internal_stage(stage_name, _sf_cfg, conn=None):
+        calls["stage"] = (stage_name, conn)
 
-    def fake_load_data(table_name, stage_name, local_path, _column_types, _sf_cfg):
-        calls["load"] = (table_name, stage_name, local_path)
+    def fake_load_data(
+        table_name, stage_name, local_path, _column_types, _sf_cfg, conn=None
+    ):
+        calls["load"] = (table_name, stage_name, local_path, conn)
         return {"affected": 1, "inserted": 1, "updated": 0}
 
+    monkeypatch.setattr(pipeline, "SnowflakeHelper", FakeSnowflakeHelper)
     monkeypatch.setattr(pipeline, "upload_to_minio", fake_upload_to_minio)
     monkeypatch.setattr(pipeline, "download_from_minio", fake_download_from_minio)
+    monkeypatch.setattr(pipeline, "csv_fingerprint", lambda _path: "fingerprint")
     monkeypatch.setattr(pipeline, "infer_schema", fake_infer_schema)
-    monkeypatch.setattr(pipeline, "create_parent_table", fake_create_parent_table)
-    monkeypatch.setattr(pipeline, "setup_internal_stage", fake_setup_internal_stage)
+    monkeypatch.setattr(
+        pipeline, "create_parent_table", FakeTask(fake_create_parent_table)
+    )
+    monkeypatch.setattr(
+        pipeline, "setup_internal_stage", FakeTask(fake_setup_internal_stage)
+    )
     monkeypatch.setattr(pipeline, "load_data", fake_load_data)
-    monkeypatch.setattr(pipeline, "validate_row_count", lambda *_args, **_kwargs: True)
-    monkeypatch.setattr(pipeline, "sample_rows", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(
+        pipeline, "validate_and_sample_rows", lambda *_args, **_kwargs: True
+    )
 
     result = pipeline.etl_pipeline.fn(str(csv_path), table_name="events")
 
@@ -70,4 +112,31 @@ def test_pipeline_smoke_with_mocked_dependencies(monkeypatch, tmp_path) -> None:
     assert result["column_count"] == 6
 
     assert calls["upload"] == (str(csv_path), "uploads/events.csv")
-    assert calls["stage"] == "local_stage"
+    # Every Snowflake task shares the single flow-scoped session.
+    shared_conn = FakeSnowflakeHelper.connection
+    assert calls["stage"] == ("local_stage", shared_conn)
+    assert calls["table"] == ("events", shared_conn)
+    assert calls["load"][3] is shared_conn
+    assert calls["infer"] == (calls["download"][1], "fingerprint")
+    # The run's temp dir is queued for the batch sweep rather than removed inline.
+    stage_dir = os.path.dirname(calls["download"][1])
+    assert os.path.dirname(stage_dir) == str(tmp_path / "stage")
+    assert temp_files._pending_dirs == {stage_dir}
+
+
+def test_pipeline_waits_for_stage_setup_when_a_step_fails(monkeypatch) -> None:
+    def failing_upload(*_args):
+        raise RuntimeError("minio unavailable")
+
+    stage_task = FakeTask(lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(pipeline, "get_minio_settings", lambda: SimpleNamespace())
+    monkeypatch.setattr(pipeline, "get_snowflake_settings", lambda: SimpleNamespace())
+    monkeypatch.setattr(pipeline, "SnowflakeHelper", FakeSnowflakeHelper)
+    monkeypatch.setattr(pipeline, "setup_internal_stage", stage_task)
+    monkeypatch.setattr(pipeline, "upload_to_minio", failing_upload)
+
+    with pytest.raises(RuntimeError, match="minio unavailable"):
+        pipeline.etl_pipeline.fn("events.csv", table_name="events")
+
+    # The session must not close while stage setup could still be using it.
+    assert stage_task.waited == 1
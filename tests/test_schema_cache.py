@@ -0,0 +1,66 @@
+from utils import schema_cache
+from utils.schema_cache import (
+    csv_fingerprint,
+    csv_sample_bytes,
+    load_cached_schema,
+    store_schema,
+)
+
+
+def test_fingerprint_is_stable_and_content_sensitive(tmp_path) -> None:
+    first = tmp_path / "a.csv"
+    same = tmp_path / "b.csv"
+    changed = tmp_path / "c.csv"
+    first.write_text("id,name\n1,Ana\n", encoding="utf-8")
+    same.write_text("id,name\n1,Ana\n", encoding="utf-8")
+    changed.write_text("id,title\n1,Ana\n", encoding="utf-8")
+
+    assert csv_fingerprint(str(first)) == csv_fingerprint(str(same))
+    assert csv_fingerprint(str(first)) != csv_fingerprint(str(changed))
+
+
+def test_schema_cache_round_trip(tmp_path) -> None:
+    cache_path = tmp_path / "cache" / "schemas.json"
+    column_types = {"id": "NUMBER", "event_metadata": "VARIANT"}
+
+    assert load_cached_schema("abc", cache_path=cache_path) is None
+    store_schema("abc", column_types, cache_path=cache_path)
+    assert load_cached_schema("abc", cache_path=cache_path) == column_types
+
+
+def test_schema_cache_treats_corrupt_file_as_miss(tmp_path) -> None:
+    cache_path = tmp_path / "schemas.json"
+    cache_path.write_text("{not json", encoding="utf-8")
+
+    assert load_cached_schema("abc", cache_path=cache_path) is None
+    store_schema("abc", {"id": "NUMBER"}, cache_path=cache_path)
+    assert load_cached_schema("abc", cache_path=cache_path) == {"id": "NUMBER"}
+
+
+def test_fingerprint_covers_exactly_the_inference_sample(tmp_path) -> None:
+    head = 'id,score\n1,"multi\nline"\n2,3\n'
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    first.write_text(head + "3,4\n", encoding="utf-8")
+    second.write_text(head + "3,4.5\n", encoding="utf-8")
+
+    # The quoted newline belongs to record 1, so two records stop before row 3.
+    assert csv_sample_bytes(str(first), max_rows=2) == head.encode()
+    assert csv_fingerprint(str(first), max_rows=2) == csv_fingerprint(
+        str(second), max_rows=2
+    )
+    assert csv_fingerprint(str(first), max_rows=3) != csv_fingerprint(
+        str(second), max_rows=3
+    )
+
+
+def test_fingerprint_changes_with_inference_version(tmp_path, monkeypatch) -> None:
+    csv_file = tmp_path / "events.csv"
+    csv_file.write_text("id\n1\n", encoding="utf-8")
+    before = csv_fingerprint(str(csv_file))
+
+    monkeypatch.setattr(
+        schema_cache, "INFERENCE_VERSION", schema_cache.INFERENCE_VERSION + 1
+    )
+
+    assert csv_fingerprint(str(csv_file)) != before
@@ -1,6 +1,12 @@
 from contextlib import contextmanager
+import glob
+import os
 from types import SimpleNamespace
 
+import pytest
+
+from flows.load import load_data
+from utils import snowflake_helpers
 from utils.snowflake_helpers import SnowflakeHelper
 
 
@@ -14,12 +20,14 @@ class FakeCursor:
         self.fetchall_results = fetchall_results or []
         self.executed_sql: list[str] = []
         self.executed_params: list[tuple | None] = []
+        self.executed_num_statements: list[int | None] = []
         self._idx = 0
         self._fetchall_idx = 0
 
-    def execute(self, sql: str, params=None):
+    def execute(self, sql: str, params=None, num_statements=None):
         self.executed_sql.append(sql)
         self.executed_params.append(params)
+        self.executed_num_statements.append(num_statements)
         return self
 
     def fetchone(self):
@@ -40,12 +48,16 @@ class FakeCursor:
 class FakeConnection:
     def __init__(self, cursor: FakeCursor):
         self._cursor = cursor
+        self.closed = False
 
     def cursor(self) -> FakeCursor:
         return self._cursor
 
+    def is_closed(self) -> bool:
+        return self.closed
+
     def close(self) -> None:
-        return None
+        self.closed = True
 
 
 def build_helper() -> SnowflakeHelper:
@@ -84,12 +96,12 @@ def test_merge_sql_uses_change_predicate_and_qualification() -> None:
     )
 
     assert result == {"inserted": 1, "updated": 0, "affected": 1}
-    assert len(cursor.executed_sql) == 2
+    # Counts are read from the MERGE result itself; no RESULT_SCAN round-trip.
+    assert len(cursor.executed_sql) == 1
     assert '"ETL_DB"."PUBLIC"."events"' in cursor.executed_sql[0]
     assert '"ETL_DB"."PUBLIC"."events_staging"' in cursor.executed_sql[0]
     assert "WHEN MATCHED AND (" in cursor.executed_sql[0]
     assert "IS DISTINCT FROM" in cursor.executed_sql[0]
-    assert "RESULT_SCAN" in cursor.executed_sql[1]
 
 
 def test_merge_with_only_key_column_skips_update_clause() -> None:
@@ -105,14 +117,17 @@ def test_merge_with_only_key_column_skips_update_clause() -> None:
     )
 
     assert result == {"inserted": 2, "updated": 0, "affected": 2}
-    assert len(cursor.executed_sql) == 2
+    assert len(cursor.executed_sql) == 1
     assert "WHEN MATCHED" not in cursor.executed_sql[0]
-    assert "RESULT_SCAN" in cursor.executed_sql[1]
 
 
 def test_secure_view_sql_flattens_variant_fields() -> None:
     helper = build_helper()
-    cursor = FakeCursor(fetchall_results=[[("id",), ("country",), ("event_metadata",)]])
+    cursor = FakeCursor(
+        fetchall_results=[
+            [("events", "id"), ("events", "country"), ("events", "event_metadata")]
+        ]
+    )
     patch_connection(helper, cursor)
 
     helper.create_secure_view(
@@ -162,3 +177,305 @@ def test_date_cast_expr_uses_explicit_formats() -> None:
     )
     assert "SPLIT_PART(TRIM(stg.\"event_date\"), '/', 3)" in expr
     assert 'ELSE TRY_TO_DATE(TRIM(stg."event_date"))' in expr
+
+
+def test_session_pins_one_connection_for_helper_calls() -> None:
+    helper = build_helper()
+    cursor = FakeCursor()
+    opened: list[FakeConnection] = []
+
+    @contextmanager
+    def counting_get_connection():
+        conn = FakeConnection(cursor)
+        opened.append(conn)
+        yield conn
+
+    helper.get_connection = counting_get_connection  # type: ignore[assignment]
+
+    with helper.session() as conn:
+        helper.create_internal_stage("local_stage")
+        helper.create_table("events", {"id": "NUMBER"}, primary_key="id")
+
+    assert opened == [conn]
+    assert len(cursor.executed_sql) == 2
+
+
+def test_validate_and_sample_uses_single_query() -> None:
+    helper = build_helper()
+    cursor = FakeCursor(fetch_results=[(3, 0, 1, '[{"id": 1}, {"id": 2}]')])
+    patch_connection(helper, cursor)
+
+    result = helper.validate_and_sample(
+        "events", limit=2, expected_min=1, null_cols=["id", "country"]
+    )
+
+    assert result == {
+        "count": 3,
+        "nulls_per_col": {"id": 0, "country": 1},
+        "sample_rows": [{"id": 1}, {"id": 2}],
+    }
+    assert len(cursor.executed_sql) == 1
+    sql = cursor.executed_sql[0]
+    assert "ARRAY_AGG(OBJECT_CONSTRUCT(*))" in sql
+    table = '"ETL_DB"."PUBLIC"."events"'
+    # Full statement, so reserved words (e.g. SAMPLE) cannot slip in as aliases.
+    assert " ".join(sql.split()) == (
+        "SELECT stats.*, sampled.sample_rows "
+        'FROM (SELECT COUNT(*), SUM(CASE WHEN "id" IS NULL THEN 1 ELSE 0 END), '
+        'SUM(CASE WHEN "country" IS NULL THEN 1 ELSE 0 END) '
+        f"FROM {table}) stats "
+        "CROSS JOIN ( SELECT ARRAY_AGG(OBJECT_CONSTRUCT(*)) AS sample_rows "
+        f"FROM (SELECT * FROM {table} LIMIT 2) ) sampled"
+    )
+
+
+def test_validate_and_sample_rejects_low_row_count() -> None:
+    helper = build_helper()
+    cursor = FakeCursor(fetch_results=[(0, None)])
+    patch_connection(helper, cursor)
+
+    with pytest.raises(ValueError, match="below minimum 1"):
+        helper.validate_and_sample("events", limit=5, expected_min=1)
+
+
+def test_secure_view_reuses_prefetched_columns() -> None:
+    helper = build_helper()
+    cursor = FakeCursor()
+    patch_connection(helper, cursor)
+
+    helper.create_secure_view(
+        view_name="recent_signups",
+        source_table="events",
+        where_clause="event_type = 'signup'",
+        columns=["id", "event_type"],
+    )
+
+    assert len(cursor.executed_sql) == 1
+    assert 'src."event_type" AS EVENT_TYPE' in cursor.executed_sql[0]
+
+
+def test_table_columns_are_cached_per_schema() -> None:
+    helper = build_helper()
+    cursor = FakeCursor(
+        fetchall_results=[
+            [("EVENTS", "id"), ("EVENTS", "country"), ("USERS", "user_id")],
+            [("EVENTS", "id"), ("EVENTS", "country"), ("USERS", "user_id")],
+        ]
+    )
+    patch_connection(helper, cursor)
+
+    assert helper.get_table_columns("events") == ["id", "country"]
+    assert helper.get_table_columns("PUBLIC.users") == ["user_id"]
+    assert len(cursor.executed_sql) == 1
+    assert cursor.executed_params == [("PUBLIC",)]
+
+    helper.invalidate_cache("public")
+    assert helper.get_table_columns("events") == ["id", "country"]
+    assert len(cursor.executed_sql) == 2
+
+
+def test_bulk_secure_views_submit_one_multi_statement_request() -> None:
+    helper = build_helper()
+    cursor = FakeCursor(fetchall_results=[[("EVENTS", "id"), ("EVENTS", "country")]])
+    patch_connection(helper, cursor)
+
+    created = helper.create_secure_views_bulk(
+        [
+            {
+                "view_name": "germany_events",
+                "source_table": "events",
+                "where_clause": "country = 'DE'",
+            },
+            {
+                "view_name": "french_events",
+                "source_table": "events",
+                "where_clause": "country = 'FR'",
+            },
+        ]
+    )
+
+    assert created == ["germany_events", "french_events"]
+    # One metadata query plus one DDL submission carrying both views.
+    assert len(cursor.executed_sql) == 2
+    assert cursor.executed_num_statements[1] == 2
+    assert cursor.executed_sql[1].count("CREATE OR REPLACE SECURE VIEW") == 2
+
+
+def test_large_put_splits_on_record_boundaries(tmp_path) -> None:
+    helper = build_helper()
+    cursor = FakeCursor()
+    patch_connection(helper, cursor)
+    csv_file = tmp_path / "events.csv"
+    csv_file.write_bytes(b'id,note\n1,"multi\nline"\n2,plain\n3,"say ""hi"""\n')
+
+    staged: dict[str, bytes] = {}
+    execute = cursor.execute
+
+    def capture_put(sql: str, params=None, num_statements=None):
+        # Chunk files only live for the duration of the PUT call.
+        for chunk_path in glob.glob(sql.split()[1].removeprefix("file://")):
+            with open(chunk_path, "rb") as chunk:
+                staged[os.path.basename(chunk_path)] = chunk.read()
+        return execute(sql, params, num_statements)
+
+    cursor.execute = capture_put
+    helper.put_file_to_stage("etl_stage", str(csv_file), chunk_bytes=8)
+
+    assert sorted(staged) == [
+        "events.csv.part0000",
+        "events.csv.part0001",
+        "events.csv.part0002",
+    ]
+    assert staged["events.csv.part0000"] == b'id,note\n1,"multi\nline"\n'
+    assert staged["events.csv.part0002"] == b'id,note\n3,"say ""hi"""\n'
+    # All parts go up in one PUT; the connector parallelizes the transfer.
+    assert len(cursor.executed_sql) == 1
+    assert cursor.executed_sql[0].split()[1].endswith("events.csv.part*")
+    assert "PARALLEL=8 AUTO_COMPRESS=TRUE" in cursor.executed_sql[0]
+
+
+def test_put_compresses_and_copy_auto_detects_gzip(tmp_path) -> None:
+    helper = build_helper()
+    cursor = FakeCursor()
+    patch_connection(helper, cursor)
+    csv_file = tmp_path / "events.csv"
+    csv_file.write_text("id\n1\n")
+
+    helper.put_file_to_stage("etl_stage", str(csv_file))
+    helper.copy_into_staging("events_staging", "etl_stage", "events.csv")
+
+    put_sql, copy_sql = cursor.executed_sql
+    assert "AUTO_COMPRESS=TRUE" in put_sql
+    assert copy_sql.count("/events.csv\n") == 1
+    assert "COMPRESSION = AUTO" in copy_sql
+
+
+def test_put_files_to_stage_uploads_pattern_in_one_command() -> None:
+    helper = build_helper()
+    cursor = FakeCursor()
+    patch_connection(helper, cursor)
+
+    helper.put_files_to_stage("etl_stage", "/data/shards/events_*.csv", parallel=4)
+
+    assert cursor.executed_sql == [
+        'PUT file:///data/shards/events_*.csv @"ETL_DB"."PUBLIC"."etl_stage" '
+        "PARALLEL=4 AUTO_COMPRESS=TRUE OVERWRITE=TRUE"
+    ]
+
+
+def test_get_connection_reuses_pooled_connections(monkeypatch) -> None:
+    helper = build_helper()
+    opened: list[FakeConnection] = []
+
+    def fake_connect(**kwargs):
+        assert kwargs["client_session_keep_alive"] is True
+        opened.append(FakeConnection(FakeCursor()))
+        return opened[-1]
+
+    monkeypatch.setattr(snowflake_helpers, "_POOL", {})
+    monkeypatch.setattr(snowflake_helpers.snowflake.connector, "connect", fake_connect)
+
+    with helper.get_connection() as first:
+        pass
+    with helper.get_connection() as second:
+        pass
+    assert first is second
+    assert len(opened) == 1
+
+    # A scope that fails discards its connection instead of pooling it.
+    with pytest.raises(RuntimeError):
+        with helper.get_connection():
+            raise RuntimeError("boom")
+    assert opened[0].closed
+    with helper.get_connection() as third:
+        pass
+    assert third is opened[1]
+
+
+def test_projection_aliases_stay_unique_across_suffix_collisions() -> None:
+    helper = build_helper()
+
+    aliases = helper._build_projection_aliases(["a", "a 2", "A", "a-2", "a_3"])
+
+    assert aliases == {
+        "a": "A",
+        "a 2": "A_2",
+        "A": "A_3",
+        "a-2": "A_2_2",
+        "a_3": "A_3_2",
+    }
+
+
+def test_sample_rows_returns_plain_row_tuples() -> None:
+    helper = build_helper()
+    cursor = FakeCursor(fetchall_results=[[(1, "DE", None)]])
+    patch_connection(helper, cursor)
+
+    assert helper.sample_rows("events", 5) == [(1, "DE", None)]
+    assert cursor.executed_sql == ['SELECT * FROM "ETL_DB"."PUBLIC"."events" LIMIT 5']
+
+
+def test_empty_copy_skips_merge() -> None:
+    helper = build_helper()
+    cursor = FakeCursor(
+        fetchall_results=[
+            [
+                ("events.csv.part0000.gz", "LOADED", 2, 2),
+                ("events.csv.part0001.gz", "LOADED", 1, 1),
+            ],
+            [("Copy executed with 0 files processed.",)],
+        ]
+    )
+    patch_connection(helper, cursor)
+
+    assert helper.copy_into_staging("events_staging", "etl_stage", "events.csv") == 3
+    staged_rows = helper.copy_into_staging("events_staging", "etl_stage", "events.csv")
+    assert staged_rows == 0
+
+    result = helper.merge_from_staging(
+        "events",
+        "events_staging",
+        merge_key="id",
+        column_types={"id": "NUMBER"},
+        staged_rows=staged_rows,
+    )
+
+    assert result == {"inserted": 0, "updated": 0, "affected": 0}
+    assert not any("MERGE INTO" in sql for sql in cursor.executed_sql)
+
+
+def test_load_data_isolates_stage_and_staging_table(monkeypatch, tmp_path) -> None:
+    cursor = FakeCursor()
+
+    @contextmanager
+    def fake_get_connection(_self):
+        yield FakeConnection(cursor)
+
+    monkeypatch.setattr(SnowflakeHelper, "get_connection", fake_get_connection)
+    csv_file = tmp_path / "events.csv"
+    csv_file.write_text("id\n1\n")
+
+    sf_cfg = build_helper().config
+    load_data.fn("events", "etl_stage", str(csv_file), {"id": "NUMBER"}, sf_cfg)
+
+    assert cursor.executed_sql[-1] == (
+        'DROP TABLE IF EXISTS "ETL_DB"."PUBLIC"."events_staging"'
+    )
+    # Leftover parts under the same prefix are cleared before this run's PUT.
+    statements = [sql.split()[0] for sql in cursor.executed_sql]
+    assert statements[:4] == ["CREATE", "REMOVE", "PUT", "COPY"]
+
+
+def test_closed_caller_connection_falls_back_to_fresh_lease() -> None:
+    helper = build_helper()
+    fresh_cursor = FakeCursor()
+    patch_connection(helper, fresh_cursor)
+    dead_cursor = FakeCursor()
+    dead = FakeConnection(dead_cursor)
+    dead.closed = True
+
+    # Retried tasks pass the same flow-owned conn; a dropped one must not stick.
+    helper.remove_from_stage("etl_stage", "events.csv", conn=dead)
+
+    assert dead_cursor.executed_sql == []
+    assert len(fresh_cursor.executed_sql) == 1
@@ -36,3 +36,18 @@ def test_subset_config_rejects_missing_where_clause() -> None:
                 "filters": [{"name": "bad_filter"}],
             }
         )
+
+
+def test_subset_config_reports_nested_flatten_location() -> None:
+    with pytest.raises(ValueError, match=r"filters\[0\]\.flatten\[1\]\.path"):
+        _validate_subsets_config(
+            {
+                "filters": [
+                    {
+                        "name": "germany_events",
+                        "where": "country = 'DE'",
+                        "flatten": ["event_metadata.user_id", {"path": " "}],
+                    }
+                ],
+            }
+        )
@@ -0,0 +1,58 @@
+import os
+import time
+
+import pytest
+
+import utils.temp_files as temp_files
+
+
+@pytest.fixture(autouse=True)
+def isolated_stage_root(monkeypatch, tmp_path):
+    monkeypatch.setattr(temp_files, "STAGE_ROOT", tmp_path / "etl_stage")
+    monkeypatch.setattr(temp_files, "_pending_dirs", set())
+    monkeypatch.setattr(temp_files, "_stale_sweep_started", True)
+    return tmp_path / "etl_stage"
+
+
+def test_finished_stage_dirs_are_removed_by_batch_sweep() -> None:
+    with temp_files.stage_tempdir() as stage_dir:
+        with open(os.path.join(stage_dir, "events.csv"), "w") as fh:
+            fh.write("id\n1\n")
+
+    assert os.path.isdir(stage_dir)
+    temp_files.sweep_stage_dirs(include_pending=True)
+    assert not os.path.exists(stage_dir)
+
+
+def test_sweep_removes_only_stale_leftovers(isolated_stage_root) -> None:
+    stale = isolated_stage_root / "etl_stale"
+    fresh = isolated_stage_root / "etl_fresh"
+    unrelated = isolated_stage_root / "keep_me"
+    for path in (stale, fresh, unrelated):
+        path.mkdir(parents=True)
+    old = time.time() - 2 * temp_files.STALE_AFTER_SECONDS
+    os.utime(stale, (old, old))
+    os.utime(unrelated, (old, old))
+
+    temp_files.sweep_stage_dirs()
+
+    assert not stale.exists()
+    assert fresh.exists()
+    assert unrelated.exists()
+
+
+@pytest.mark.skipif(temp_files.fcntl is None, reason="needs flock")
+def test_sweep_keeps_stale_dirs_that_are_still_locked() -> None:
+    old = time.time() - 2 * temp_files.STALE_AFTER_SECONDS
+    with temp_files.stage_tempdir() as active_dir:
+        os.utime(active_dir, (old, old))
+
+        temp_files.sweep_stage_dirs()
+
+        # flock conflicts across file descriptions, so this also covers
+        # a run in another process.
+        assert os.path.isdir(active_dir)
+
+    os.utime(active_dir, (old, old))
+    temp_files.sweep_stage_dirs()
+    assert not os.path.exists(active_dir)
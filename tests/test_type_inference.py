@@ -2,6 +2,7 @@ from pathlib import Path
 
 import pandas as pd
 
+from flows.load import read_csv_sample
 from utils.type_inference import TypeInferenceEngine
 
 
@@ -43,3 +44,70 @@ def test_regular_text_column_stays_varchar() -> None:
     )
     inferred = engine.infer_types(df)
     assert inferred["name"] == "VARCHAR"
+
+
+def test_csv_sample_is_bounded_and_keeps_inferred_types() -> None:
+    engine = TypeInferenceEngine()
+    sample = read_csv_sample("data/sample/events_1.csv", max_rows=2)
+
+    assert len(sample) == 2
+    assert engine.infer_types(sample) == engine.infer_types(
+        pd.read_csv("data/sample/events_1.csv")
+    )
+
+
+def test_date_detection_rejects_long_text_and_accepts_datetimes() -> None:
+    engine = TypeInferenceEngine()
+    df = pd.DataFrame(
+        {
+            "note_date": ["x" * 50] * 3,
+            "load_date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+        }
+    )
+
+    inferred = engine.infer_types(df)
+
+    assert inferred["note_date"] == "VARCHAR"
+    assert inferred["load_date"] == "DATE"
+
+
+def test_nullable_extension_dtypes_map_to_numeric_types() -> None:
+    engine = TypeInferenceEngine()
+    df = pd.DataFrame(
+        {
+            "small": pd.array([1, None, 3], dtype="Int8"),
+            "unsigned": pd.array([1, 2, 3], dtype="UInt32"),
+            "ratio": pd.array([0.5, None, 1.5], dtype="Float32"),
+            "flag": pd.array([True, None, False], dtype="boolean"),
+        }
+    )
+
+    assert engine.infer_types(df) == {
+        "small": "NUMBER",
+        "unsigned": "NUMBER",
+        "ratio": "FLOAT",
+        "flag": "BOOLEAN",
+    }
+
+
+def test_sparse_columns_still_detect_json_and_dates() -> None:
+    engine = TypeInferenceEngine()
+    leading_nulls = [None] * 150
+    df = pd.DataFrame(
+        {
+            "event_metadata": leading_nulls + ['{"user_id": 1}'] * 50,
+            "event_date": leading_nulls + ["2025-01-01"] * 50,
+        }
+    )
+
+    inferred = engine.infer_types(df)
+
+    assert inferred["event_metadata"] == "VARIANT"
+    assert inferred["event_date"] == "DATE"
+
+
+def test_padded_iso_dates_still_infer_as_date() -> None:
+    engine = TypeInferenceEngine()
+    df = pd.DataFrame({"event_date": ["2025-01-03 ", "2025-01-04 ", "2025-01-05"]})
+
+    assert engine.infer_types(df)["event_date"] == "DATE"
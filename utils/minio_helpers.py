@@ -1,10 +1,46 @@
+from functools import lru_cache
+
 from prefect import task
 from prefect.cache_policies import NONE
 from minio import Minio
-import pandas as pd
+from minio.error import S3Error
 
 from config.settings import MinIOSettings
 
+_BUCKET_EXISTS_CODES = ("BucketAlreadyOwnedByYou", "BucketAlreadyExists")
+# (endpoint, bucket) pairs already bootstrapped by this process.
+_ensured_buckets: set[tuple[str, str]] = set()
+
+
+@lru_cache(maxsize=8)
+def _get_client(
+    endpoint: str, access_key: str, secret_key: str, secure: bool
+) -> Minio:
+    """Share one client (and its urllib3 pool) per credential set for keepalive."""
+    return Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+
+
+def _client_for(minio_config: MinIOSettings) -> Minio:
+    return _get_client(
+        minio_config.endpoint,
+        minio_config.access_key,
+        minio_config.secret_key,
+        minio_config.secure,
+    )
+
+
+def _ensure_bucket(client: Minio, endpoint: str, bucket: str) -> None:
+    """Create the bucket at most once per process, tolerating existing buckets."""
+    key = (endpoint, bucket)
+    if key in _ensured_buckets:
+        return
+    try:
+        client.make_bucket(bucket)
+    except S3Error as exc:
+        if exc.code not in _BUCKET_EXISTS_CODES:
+            raise
+    _ensured_buckets.add(key)
+
 
 @task(cache_policy=NONE, retries=3)
 def upload_to_minio(
@@ -17,16 +53,10 @@ def upload_to_minio(
     current flow invocation.
     """
 
-    client = Minio(
-        minio_config.endpoint,
-        access_key=minio_config.access_key,
-        secret_key=minio_config.secret_key,
-        secure=minio_config.secure,
-    )
+    client = _client_for(minio_config)
 
     # Local docker runs bootstrap bucket state on demand.
-    if not client.bucket_exists(minio_config.bucket):
-        client.make_bucket(minio_config.bucket)
+    _ensure_bucket(client, minio_config.endpoint, minio_config.bucket)
 
     client.fput_object(minio_config.bucket, object_name, file_path)
 
@@ -36,20 +66,18 @@ def upload_to_minio(
 @task(cache_policy=NONE)
 def download_from_minio(
     object_name: str, output_path: str, minio_config: MinIOSettings
-) -> pd.DataFrame:
+) -> str:
     """
-    Download object from MinIO and return parsed CSV rows for downstream typing.
+    Download object from MinIO and return the local path for staging.
+
+    Parsing is left to callers so the full file is never materialized when
+    only a sample is needed for typing.
 
     Cache is disabled to avoid reusing stale local files across flow runs.
     """
 
-    client = Minio(
-        minio_config.endpoint,
-        access_key=minio_config.access_key,
-        secret_key=minio_config.secret_key,
-        secure=minio_config.secure,
-    )
+    client = _client_for(minio_config)
 
     client.fget_object(minio_config.bucket, object_name, output_path)
 
-    return pd.read_csv(output_path)
+    return output_path
@@ -0,0 +1,86 @@
+from typing import Dict
+from pathlib import Path
+import hashlib
+import json
+import os
+
+# Type inference only needs a bounded head sample; the full file goes to PUT as-is.
+INFERENCE_SAMPLE_ROWS = 10_000
+# Bump whenever TypeInferenceEngine rules change so cached schemas are re-inferred.
+INFERENCE_VERSION = 2
+MAX_CACHED_SCHEMAS = 256
+SCHEMA_CACHE_PATH = Path.home() / ".cache" / "etl" / "schemas.json"
+
+
+def csv_sample_bytes(csv_path: str, max_rows: int = INFERENCE_SAMPLE_ROWS) -> bytes:
+    """
+    Return the header plus the first `max_rows` records of a CSV, verbatim.
+
+    Records end only on newlines outside quoted fields, so multi-line values
+    are never cut. Inference parses exactly these bytes and the fingerprint
+    hashes exactly these bytes, so equal fingerprints mean equal input.
+    """
+    kept = []
+    records = 0
+    in_quotes = False
+    with open(csv_path, "rb") as fh:
+        # The header is record zero; stop once `max_rows` data records follow it.
+        for line in fh:
+            if records > max_rows:
+                break
+            kept.append(line)
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                records += 1
+    return b"".join(kept)
+
+
+def csv_fingerprint(csv_path: str, max_rows: int = INFERENCE_SAMPLE_ROWS) -> str:
+    """Hash the inference sample and engine version; reruns of the same file match."""
+    digest = hashlib.blake2b(f"v{INFERENCE_VERSION}|".encode())
+    digest.update(csv_sample_bytes(csv_path, max_rows))
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: Path) -> Dict[str, Dict[str, str]]:
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cached if isinstance(cached, dict) else {}
+
+
+def load_cached_schema(
+    fingerprint: str, cache_path: Path = SCHEMA_CACHE_PATH
+) -> Dict[str, str] | None:
+    """Return previously inferred column types for a fingerprint, if any."""
+    column_types = _read_cache(cache_path).get(fingerprint)
+    return dict(column_types) if isinstance(column_types, dict) else None
+
+
+def store_schema(
+    fingerprint: str,
+    column_types: Dict[str, str],
+    cache_path: Path = SCHEMA_CACHE_PATH,
+) -> None:
+    """
+    Persist inferred column types under their fingerprint.
+
+    The cache is an optimization only: write failures are swallowed, and the
+    oldest entries are evicted once `MAX_CACHED_SCHEMAS` is exceeded.
+    """
+    cached = _read_cache(cache_path)
+    cached.pop(fingerprint, None)
+    cached[fingerprint] = column_types
+    while len(cached) > MAX_CACHED_SCHEMAS:
+        cached.pop(next(iter(cached)))
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(cached), encoding="utf-8")
+        # Atomic swap so concurrent runs never observe a half-written file.
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
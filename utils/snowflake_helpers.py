@@ -1,41 +1,211 @@
+import atexit
 from contextlib import contextmanager
+from functools import lru_cache
+import json
+import os
+from queue import Empty, Full, Queue
 import re
+import tempfile
+import threading
+import time
 from typing import Any, Dict, Iterable, List
 
 import snowflake.connector
 
 from config.settings import SnowflakeSettings
 
+# Files above this size are split into record-aligned parts and PUT concurrently.
+PUT_CHUNK_BYTES = 200 * 1024 * 1024
+# Upload threads the connector's file transfer agent uses per PUT command.
+PUT_PARALLEL = 8
+
+# Characters that cannot appear in an unquoted Snowflake identifier.
+_UNQUOTED_IDENT_RE = re.compile(r"[^A-Za-z0-9_]")
+
+# Idle connections kept per parameter set, and how long one may sit unused.
+POOL_MAX_IDLE = 4
+POOL_IDLE_SECONDS = 15 * 60
+
+_POOL: Dict[tuple, Queue] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _close_quietly(conn) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _idle_pool(key: tuple) -> Queue:
+    with _POOL_LOCK:
+        return _POOL.setdefault(key, Queue(maxsize=POOL_MAX_IDLE))
+
+
+def _lease_connection(key: tuple):
+    """Return a live idle connection for `key`, or None when the pool is empty."""
+    pool = _idle_pool(key)
+    while True:
+        try:
+            conn, idle_since = pool.get_nowait()
+        except Empty:
+            return None
+        if conn.is_closed() or time.monotonic() - idle_since > POOL_IDLE_SECONDS:
+            _close_quietly(conn)
+            continue
+        return conn
+
+
+def _release_connection(key: tuple, conn) -> None:
+    try:
+        _idle_pool(key).put_nowait((conn, time.monotonic()))
+    except Full:
+        _close_quietly(conn)
+
+
+def close_pooled_connections() -> None:
+    """Close every idle pooled connection (registered to run at exit)."""
+    with _POOL_LOCK:
+        pools = list(_POOL.values())
+    for pool in pools:
+        while True:
+            try:
+                conn, _ = pool.get_nowait()
+            except Empty:
+                break
+            _close_quietly(conn)
+
+
+atexit.register(close_pooled_connections)
+
+
+def _split_csv_records(file_path: str, out_dir: str, chunk_bytes: int) -> List[str]:
+    """
+    Split a CSV into ``chunk_bytes``-sized parts that each repeat the header.
+
+    Parts only end on record boundaries: a newline inside a quoted field keeps
+    the current part open, so COPY never sees a record torn across two files.
+    """
+    base_name = os.path.basename(file_path)
+    chunk_paths: List[str] = []
+    out = None
+    in_quotes = False
+    try:
+        with open(file_path, "rb") as src:
+            header = src.readline()
+            for line in src:
+                if out is None:
+                    chunk_path = os.path.join(
+                        out_dir, f"{base_name}.part{len(chunk_paths):04d}"
+                    )
+                    chunk_paths.append(chunk_path)
+                    out = open(chunk_path, "wb")
+                    out.write(header)
+                out.write(line)
+                # Escaped quotes ("") flip parity twice, so odd counts mean an
+                # unterminated quoted field continues on the next line.
+                if line.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                if not in_quotes and out.tell() >= chunk_bytes:
+                    out.close()
+                    out = None
+    finally:
+        if out is not None:
+            out.close()
+    return chunk_paths
+
 
 class SnowflakeHelper:
     """Snowflake DDL/DML primitives used by the ETL flows."""
 
     _CAST_TYPE_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]*(\([0-9,\s]+\))?$")
 
+    # Snowflake can map 2-digit years into year 0025 depending on session parsing.
+    # Normalize MM/DD/YY to MM/DD/20YY to keep event data deterministic.
+    # Built once; only the column expression ({e}) is interpolated per call.
+    _DATE_CAST_TEMPLATE = (
+        "CASE "
+        "WHEN REGEXP_LIKE(TRIM({e}), '^[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}$') "
+        "THEN TRY_TO_DATE(TRIM({e}), 'YYYY-MM-DD') "
+        "WHEN REGEXP_LIKE(TRIM({e}), '^[0-9]{{1,2}}/[0-9]{{1,2}}/[0-9]{{2}}$') "
+        "THEN TRY_TO_DATE("
+        "LPAD(SPLIT_PART(TRIM({e}), '/', 1), 2, '0') || '/' || "
+        "LPAD(SPLIT_PART(TRIM({e}), '/', 2), 2, '0') || '/20' || "
+        "SPLIT_PART(TRIM({e}), '/', 3), 'MM/DD/YYYY') "
+        "ELSE TRY_TO_DATE(TRIM({e})) "
+        "END"
+    )
+    _CAST_TEMPLATES = {
+        "NUMBER": "TRY_TO_NUMBER({e})",
+        "FLOAT": "TRY_TO_DOUBLE({e})",
+        "DATE": _DATE_CAST_TEMPLATE,
+        "TIMESTAMP_NTZ": "TRY_TO_TIMESTAMP_NTZ({e})",
+        "BOOLEAN": "TRY_TO_BOOLEAN({e})",
+        "VARIANT": "TRY_PARSE_JSON({e})",
+    }
+
     def __init__(self, config: SnowflakeSettings):
         self.config = config
+        self._session_conn = None
+        # (database, SCHEMA) -> TABLE -> ordered column names.
+        self._columns_cache: Dict[tuple[str, str], Dict[str, List[str]]] = {}
 
     @contextmanager
     def get_connection(self):
-        """Open a short-lived Snowflake connection for a single operation scope."""
-        conn = snowflake.connector.connect(
-            account=self.config.account,
-            user=self.config.user,
-            password=self.config.password,
-            warehouse=self.config.warehouse,
-            database=self.config.database,
-            schema=self.config.schema_,
-            role=self.config.role,
-        )
+        """
+        Lease a pooled Snowflake connection for a single operation scope.
+
+        Connections go back to the pool on a clean exit so later scopes skip
+        the TLS + auth handshake; on error the session state is unknown, so
+        the connection is closed instead.
+        """
+        # Warehouse/database/schema/role ride on the login request, so a new
+        # session needs no follow-up USE statements before its first query.
+        params = {
+            "account": self.config.account,
+            "user": self.config.user,
+            "password": self.config.password,
+            "warehouse": self.config.warehouse,
+            "database": self.config.database,
+            "schema": self.config.schema_,
+            "role": self.config.role,
+        }
+        key = tuple(params.values())
+        conn = _lease_connection(key)
+        if conn is None:
+            # Keep-alive stops idle pooled sessions from expiring server-side.
+            conn = snowflake.connector.connect(**params, client_session_keep_alive=True)
         try:
             yield conn
-        finally:
-            conn.close()
+        except BaseException:
+            _close_quietly(conn)
+            raise
+        _release_connection(key, conn)
+
+    @contextmanager
+    def session(self, conn=None):
+        """
+        Pin one connection for every helper call made within the scope.
+
+        Pass `conn` to adopt a caller-owned connection; otherwise one is leased
+        from the pool for the scope, so N operations share a single session.
+        """
+        with self._connection(conn) as active_conn:
+            previous = self._session_conn
+            self._session_conn = active_conn
+            try:
+                yield active_conn
+            finally:
+                self._session_conn = previous
 
     @contextmanager
     def _connection(self, conn=None):
-        """Reuse a caller-owned connection or fallback to a managed short-lived one."""
-        if conn is not None:
+        """Reuse a caller-owned connection or fallback to a managed pooled one."""
+        if conn is None:
+            conn = self._session_conn
+        # A dropped caller session falls back to a fresh lease, so task retries
+        # can recover instead of failing on the same dead connection.
+        if conn is not None and not conn.is_closed():
             yield conn
             return
         with self.get_connection() as managed_conn:
@@ -176,10 +346,53 @@ class SnowflakeHelper:
         with self._connection(conn) as active_conn:
             active_conn.cursor().execute(ddl)
 
-    def put_file_to_stage(self, stage_name: str, file_path: str, conn=None) -> None:
-        """Upload local file to stage before COPY into a staging table."""
+    def put_file_to_stage(
+        self,
+        stage_name: str,
+        file_path: str,
+        conn=None,
+        chunk_bytes: int = PUT_CHUNK_BYTES,
+        parallel: int = PUT_PARALLEL,
+    ) -> None:
+        """
+        Upload local file to stage before COPY into a staging table.
+
+        Large files are split into ``<name>.partNNNN`` parts that are PUT
+        concurrently; COPY still matches them through the ``<name>`` prefix.
+        """
+        with self._connection(conn) as active_conn:
+            if os.path.getsize(file_path) <= chunk_bytes:
+                self.put_files_to_stage(
+                    stage_name, file_path, parallel=parallel, conn=active_conn
+                )
+                return
+
+            chunk_root = os.path.dirname(os.path.abspath(file_path))
+            with tempfile.TemporaryDirectory(prefix="put_", dir=chunk_root) as tmp:
+                _split_csv_records(file_path, tmp, chunk_bytes)
+                part_glob = os.path.join(tmp, f"{os.path.basename(file_path)}.part*")
+                self.put_files_to_stage(
+                    stage_name, part_glob, parallel=parallel, conn=active_conn
+                )
+
+    def put_files_to_stage(
+        self,
+        stage_name: str,
+        file_glob: str,
+        parallel: int = PUT_PARALLEL,
+        conn=None,
+    ) -> None:
+        """
+        Upload every local file matching ``file_glob`` in one PUT command.
+
+        The connector expands the pattern and uploads matches on ``parallel``
+        threads, so sharded inputs avoid one round trip per file.
+        """
         stage_ref = self._stage_reference(stage_name)
-        sql = f"PUT file://{file_path} {stage_ref} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
+        sql = (
+            f"PUT file://{file_glob} {stage_ref} "
+            f"PARALLEL={int(parallel)} AUTO_COMPRESS=TRUE OVERWRITE=TRUE"
+        )
         with self._connection(conn) as active_conn:
             active_conn.cursor().execute(sql)
 
@@ -207,14 +420,30 @@ class SnowflakeHelper:
         with self._connection(conn) as active_conn:
             active_conn.cursor().execute(ddl)
 
+    def drop_staging_table(self, staging_table: str, conn=None) -> None:
+        """
+        Drop the staging table explicitly.
+
+        TEMP tables only vanish with their session, and pooled sessions outlive
+        a load, so leaving it would pin a full copy of the batch until reuse.
+        """
+        sql = f"DROP TABLE IF EXISTS {self.qualify_name(staging_table)}"
+        with self._connection(conn) as active_conn:
+            active_conn.cursor().execute(sql)
+
     def copy_into_staging(
         self,
         staging_table: str,
         stage_name: str,
         stage_file: str,
         conn=None,
-    ) -> None:
-        """COPY staged CSV payload into the staging table."""
+    ) -> int:
+        """
+        COPY staged CSV payload into the staging table; return rows loaded.
+
+        ``stage_file`` is a prefix, so it also matches the ``.gz`` (and
+        ``.partNNNN.gz``) names PUT produces when it compresses uploads.
+        """
         staging_name = self.qualify_name(staging_table)
         stage_ref = self._stage_reference(stage_name, file_name=stage_file)
         sql = f"""
@@ -222,45 +451,25 @@ class SnowflakeHelper:
         FROM {stage_ref}
         FILE_FORMAT = (
             TYPE = 'CSV'
+            COMPRESSION = AUTO
             SKIP_HEADER = 1
             FIELD_OPTIONALLY_ENCLOSED_BY = '"'
         )
         """
         with self._connection(conn) as active_conn:
-            active_conn.cursor().execute(sql)
+            cursor = active_conn.cursor()
+            cursor.execute(sql)
+            # One row per file: (file, status, rows_parsed, rows_loaded, ...).
+            # "0 files processed" comes back as a single-column status row.
+            return sum(
+                int(row[3] or 0) for row in cursor.fetchall() if len(row) >= 4
+            )
 
-    @staticmethod
-    def build_cast_expr(column_expr: str, snowflake_type: str) -> str:
+    @classmethod
+    def build_cast_expr(cls, column_expr: str, snowflake_type: str) -> str:
         """Map staging VARCHAR values into target Snowflake types with tolerant parsing."""
-        type_upper = snowflake_type.upper()
-        if type_upper == "NUMBER":
-            return f"TRY_TO_NUMBER({column_expr})"
-        if type_upper == "FLOAT":
-            return f"TRY_TO_DOUBLE({column_expr})"
-        if type_upper == "DATE":
-            trimmed = f"TRIM({column_expr})"
-            # Snowflake can map 2-digit years into year 0025 depending on session parsing.
-            # Normalize MM/DD/YY to MM/DD/20YY to keep event data deterministic.
-            mmddyy_as_20yy = (
-                f"LPAD(SPLIT_PART({trimmed}, '/', 1), 2, '0') || '/' || "
-                f"LPAD(SPLIT_PART({trimmed}, '/', 2), 2, '0') || '/20' || SPLIT_PART({trimmed}, '/', 3)"
-            )
-            return (
-                "CASE "
-                f"WHEN REGEXP_LIKE({trimmed}, '^[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}$') "
-                f"THEN TRY_TO_DATE({trimmed}, 'YYYY-MM-DD') "
-                f"WHEN REGEXP_LIKE({trimmed}, '^[0-9]{{1,2}}/[0-9]{{1,2}}/[0-9]{{2}}$') "
-                f"THEN TRY_TO_DATE({mmddyy_as_20yy}, 'MM/DD/YYYY') "
-                f"ELSE TRY_TO_DATE({trimmed}) "
-                "END"
-            )
-        if type_upper == "TIMESTAMP_NTZ":
-            return f"TRY_TO_TIMESTAMP_NTZ({column_expr})"
-        if type_upper == "BOOLEAN":
-            return f"TRY_TO_BOOLEAN({column_expr})"
-        if type_upper == "VARIANT":
-            return f"TRY_PARSE_JSON({column_expr})"
-        return f"TO_VARCHAR({column_expr})"
+        template = cls._CAST_TEMPLATES.get(snowflake_type.upper(), "TO_VARCHAR({e})")
+        return template.format(e=column_expr)
 
     def merge_from_staging(
         self,
@@ -269,22 +478,31 @@ class SnowflakeHelper:
         merge_key: str,
         column_types: Dict[str, str],
         conn=None,
+        staged_rows: int | None = None,
     ) -> Dict[str, int]:
         """
         Merge staging rows into target table and return atomic insert/update counts.
 
-        Counts come from `RESULT_SCAN(LAST_QUERY_ID())` in the same session as
-        the MERGE, so reported stats reflect the actual mutation statement.
+        Counts come from the MERGE statement's own result row (rows inserted,
+        rows updated), so reported stats reflect the actual mutation without
+        a follow-up `RESULT_SCAN` round-trip. Pass `staged_rows` from COPY to
+        skip the MERGE entirely when staging is known to be empty.
         """
+        if staged_rows == 0:
+            return {"inserted": 0, "updated": 0, "affected": 0}
+
         target_name = self.qualify_name(target_table)
         staging_name = self.qualify_name(staging_table)
         merge_key_q = self.quote_identifier(merge_key)
         columns = list(column_types.keys())
-
-        select_cols = [
-            f"{self.build_cast_expr(f'stg.{self.quote_identifier(col)}', dtype)} AS {self.quote_identifier(col)}"
+        # Each column appears in up to six clauses; quote and cast it once.
+        qcols = {col: self.quote_identifier(col) for col in columns}
+        qcast = {
+            col: self.build_cast_expr(f"stg.{qcols[col]}", dtype)
             for col, dtype in column_types.items()
-        ]
+        }
+
+        select_cols = [f"{qcast[col]} AS {qcols[col]}" for col in columns]
         src_cte = f"""
         SELECT {", ".join(select_cols)}
         FROM {staging_name} stg
@@ -292,12 +510,11 @@ class SnowflakeHelper:
 
         updatable_columns = [col for col in columns if col != merge_key]
         update_assignments = [
-            f"tgt.{self.quote_identifier(col)} = src.{self.quote_identifier(col)}"
-            for col in updatable_columns
+            f"tgt.{qcols[col]} = src.{qcols[col]}" for col in updatable_columns
         ]
         diff_predicate = " OR ".join(
             [
-                f"tgt.{self.quote_identifier(col)} IS DISTINCT FROM src.{self.quote_identifier(col)}"
+                f"tgt.{qcols[col]} IS DISTINCT FROM src.{qcols[col]}"
                 for col in updatable_columns
             ]
         )
@@ -310,10 +527,8 @@ class SnowflakeHelper:
         else:
             when_matched_clause = ""
 
-        insert_columns = ", ".join(self.quote_identifier(col) for col in columns)
-        insert_values = ", ".join(
-            f"src.{self.quote_identifier(col)}" for col in columns
-        )
+        insert_columns = ", ".join(qcols[col] for col in columns)
+        insert_values = ", ".join(f"src.{qcols[col]}" for col in columns)
         merge_sql = f"""
         MERGE INTO {target_name} tgt
         USING (
@@ -330,7 +545,6 @@ class SnowflakeHelper:
             cursor = active_conn.cursor()
             cursor.execute(merge_sql)
             # Read MERGE action counts from the executed statement itself.
-            cursor.execute("SELECT * FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()))")
             result = cursor.fetchone()
             inserted = (
                 int(result[0])
@@ -348,6 +562,62 @@ class SnowflakeHelper:
                 "affected": inserted + updated,
             }
 
+    def _null_count_exprs(self, columns: List[str]) -> List[str]:
+        return [
+            f"SUM(CASE WHEN {self.quote_identifier(col)} IS NULL THEN 1 ELSE 0 END)"
+            for col in columns
+        ]
+
+    def sample_rows(self, table_name: str, limit: int, conn=None) -> List[tuple]:
+        """Fetch up to `limit` rows as the connector's plain row tuples."""
+        table_name_q = self.qualify_name(table_name)
+        with self._connection(conn) as active_conn:
+            cursor = active_conn.cursor()
+            cursor.execute(f"SELECT * FROM {table_name_q} LIMIT {int(limit)}")
+            return cursor.fetchall()
+
+    def validate_and_sample(
+        self,
+        table_name: str,
+        limit: int,
+        expected_min: int,
+        null_cols: List[str] | None = None,
+        conn=None,
+    ) -> Dict[str, Any]:
+        """
+        Check row count, per-column NULLs, and fetch a bounded sample in one query.
+
+        Returns ``{"count", "nulls_per_col", "sample_rows"}``. Sample rows come
+        back as one `ARRAY_AGG(OBJECT_CONSTRUCT(*))` value, so keys follow
+        column names and NULL fields are omitted.
+        """
+        null_cols = null_cols or []
+        table_name_q = self.qualify_name(table_name)
+        stats_exprs = ["COUNT(*)"] + self._null_count_exprs(null_cols)
+        sql = f"""
+        SELECT stats.*, sampled.sample_rows
+        FROM (SELECT {", ".join(stats_exprs)} FROM {table_name_q}) stats
+        CROSS JOIN (
+            SELECT ARRAY_AGG(OBJECT_CONSTRUCT(*)) AS sample_rows
+            FROM (SELECT * FROM {table_name_q} LIMIT {int(limit)})
+        ) sampled
+        """
+        with self._connection(conn) as active_conn:
+            cursor = active_conn.cursor()
+            cursor.execute(sql)
+            row = cursor.fetchone()
+
+        count, sample_json = int(row[0]), row[-1]
+        if count < expected_min:
+            raise ValueError(f"Row count {count} below minimum {expected_min}")
+        # SUM over an empty table is NULL rather than 0.
+        nulls = {col: int(value or 0) for col, value in zip(null_cols, row[1:-1])}
+        return {
+            "count": count,
+            "nulls_per_col": nulls,
+            "sample_rows": json.loads(sample_json) if sample_json else [],
+        }
+
     def create_secure_view(
         self,
         view_name: str,
@@ -355,15 +625,64 @@ class SnowflakeHelper:
         where_clause: str,
         flatten_columns: List[Any] | None = None,
         conn=None,
+        columns: List[str] | None = None,
     ) -> None:
         """
         Create secure subset view with optional flattened JSON projections.
 
         Source columns are projected to deterministic unquoted aliases first,
         so config filters like `country = 'DE'` remain stable even when the
-        underlying table uses quoted/case-sensitive column names.
+        underlying table uses quoted/case-sensitive column names. Pass
+        `columns` to reuse an earlier `get_table_columns` lookup.
         """
-        source_columns = self.get_table_columns(source_table, conn=conn)
+        source_columns = columns
+        if source_columns is None:
+            source_columns = self.get_table_columns(source_table, conn=conn)
+        ddl = self._secure_view_ddl(
+            view_name, source_table, where_clause, flatten_columns, source_columns
+        )
+        with self._connection(conn) as active_conn:
+            active_conn.cursor().execute(ddl)
+
+    def create_secure_views_bulk(
+        self, views: List[Dict[str, Any]], conn=None
+    ) -> List[str]:
+        """
+        Create several secure views with a single multi-statement submission.
+
+        Each spec takes `create_secure_view` keyword arguments (`view_name`,
+        `source_table`, `where_clause`, optional `flatten_columns`). Source
+        columns resolve through the cached `get_table_columns`, so views over
+        one table share a single metadata query.
+        """
+        if not views:
+            return []
+
+        with self._connection(conn) as active_conn:
+            ddls = [
+                self._secure_view_ddl(
+                    spec["view_name"],
+                    spec["source_table"],
+                    spec["where_clause"],
+                    spec.get("flatten_columns"),
+                    self.get_table_columns(spec["source_table"], conn=active_conn),
+                )
+                for spec in views
+            ]
+            # Statement count is enforced server-side, so a stray `;` in a
+            # where clause fails the request instead of running extra SQL.
+            active_conn.cursor().execute(";\n".join(ddls), num_statements=len(ddls))
+        return [spec["view_name"] for spec in views]
+
+    def _secure_view_ddl(
+        self,
+        view_name: str,
+        source_table: str,
+        where_clause: str,
+        flatten_columns: List[Any] | None,
+        source_columns: List[str],
+    ) -> str:
+        """Render the secure-view DDL for one view over known source columns."""
         projection_aliases = self._build_projection_aliases(source_columns)
         alias_lookup = {col.lower(): alias for col, alias in projection_aliases.items()}
         # Normalize source names once in a subquery; outer WHERE stays human-readable.
@@ -390,7 +709,7 @@ class SnowflakeHelper:
 
         view_name_q = self.qualify_name(view_name)
         source_name_q = self.qualify_name(source_table)
-        ddl = f"""
+        return f"""
         CREATE OR REPLACE SECURE VIEW {view_name_q} AS
         SELECT {", ".join(select_cols)}
         FROM (
@@ -399,8 +718,6 @@ class SnowflakeHelper:
         ) base
         WHERE {where_clause}
         """
-        with self._connection(conn) as active_conn:
-            active_conn.cursor().execute(ddl)
 
     @staticmethod
     def normalize_flatten_columns(
@@ -435,24 +752,55 @@ class SnowflakeHelper:
         return json_expr
 
     def get_table_columns(self, table_name: str, conn=None) -> List[str]:
-        """Read physical column names so view generation can respect Snowflake casing."""
+        """
+        Read physical column names so view generation can respect Snowflake casing.
+
+        Columns for a whole schema are fetched in one INFORMATION_SCHEMA query
+        and cached per helper; lookups for other tables in the same schema are
+        served from memory. A table missing from the cache triggers one refetch,
+        since it may have been created after the schema was cached.
+        """
         database, schema, table = self._name_parts(table_name)
+        key = (database, schema.upper())
+        tables = self._columns_cache.get(key)
+        if tables is None or table.upper() not in tables:
+            tables = self._fetch_schema_columns(database, schema, conn=conn)
+            self._columns_cache[key] = tables
+        return list(tables.get(table.upper(), []))
+
+    def _fetch_schema_columns(
+        self, database: str, schema: str, conn=None
+    ) -> Dict[str, List[str]]:
         info_schema = f"{self.quote_identifier(database)}.INFORMATION_SCHEMA.COLUMNS"
         sql = f"""
-        SELECT COLUMN_NAME
+        SELECT TABLE_NAME, COLUMN_NAME
         FROM {info_schema}
         WHERE UPPER(TABLE_SCHEMA) = UPPER(%s)
-          AND UPPER(TABLE_NAME) = UPPER(%s)
-        ORDER BY ORDINAL_POSITION
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
         """
         with self._connection(conn) as active_conn:
             cursor = active_conn.cursor()
-            cursor.execute(sql, (schema, table))
-            return [row[0] for row in cursor.fetchall()]
+            cursor.execute(sql, (schema,))
+            rows = cursor.fetchall()
+
+        tables: Dict[str, List[str]] = {}
+        for table_name, column_name in rows:
+            tables.setdefault(table_name.upper(), []).append(column_name)
+        return tables
+
+    def invalidate_cache(self, schema: str | None = None) -> None:
+        """Drop cached column metadata after DDL, for one schema or all of them."""
+        if schema is None:
+            self._columns_cache.clear()
+            return
+        for key in [key for key in self._columns_cache if key[1] == schema.upper()]:
+            del self._columns_cache[key]
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _normalize_unquoted_identifier(name: str) -> str:
-        token = re.sub(r"[^A-Za-z0-9_]", "_", name.strip()).upper()
+        # Cached: the same source column names recur across every view built.
+        token = _UNQUOTED_IDENT_RE.sub("_", name.strip()).upper()
         token = token.strip("_")
         if not token:
             token = "COL"
@@ -466,13 +814,17 @@ class SnowflakeHelper:
         """Create deterministic unquoted aliases for stable filter and flatten paths."""
         aliases: Dict[str, str] = {}
         used: set[str] = set()
+        # Resume each base at its last suffix: `used` only grows, so lower
+        # suffixes stay taken and re-probing them is wasted work.
+        next_suffix: Dict[str, int] = {}
         for col in source_columns:
             base = self._normalize_unquoted_identifier(col)
             candidate = base
-            idx = 2
+            idx = next_suffix.get(base, 2)
             while candidate in used:
                 candidate = f"{base}_{idx}"
                 idx += 1
+            next_suffix[base] = idx
             used.add(candidate)
             aliases[col] = candidate
         return aliases
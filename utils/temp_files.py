@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from pathlib import Path
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so only this process's dirs are swept
+    fcntl = None
+
+# Dedicated root so the sweeper never touches unrelated temp files.
+STAGE_ROOT = Path(tempfile.gettempdir()) / "etl_stage"
+STALE_AFTER_SECONDS = 3600
+# Held under flock while a run uses its dir; the kernel drops it if we crash.
+LOCK_FILE = ".lock"
+
+_pending_dirs: set[str] = set()
+_pending_lock = threading.Lock()
+_stale_sweep_started = False
+
+
+@contextmanager
+def stage_tempdir():
+    """
+    Yield a fresh `etl_*` directory for one flow run's local artifacts.
+
+    Nothing is deleted inline: finished directories (each a full local copy of
+    the input CSV) stay on disk until interpreter exit, where they are removed
+    in one batch. Leftovers from crashed processes are swept by a background
+    thread once stale and no longer locked.
+    """
+    STAGE_ROOT.mkdir(parents=True, exist_ok=True)
+    path = tempfile.mkdtemp(prefix="etl_", dir=STAGE_ROOT)
+    lock_fd = os.open(os.path.join(path, LOCK_FILE), os.O_CREAT | os.O_WRONLY)
+    if fcntl is not None:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    _start_stale_sweep()
+    try:
+        yield path
+    finally:
+        os.close(lock_fd)
+        with _pending_lock:
+            _pending_dirs.add(path)
+
+
+def _start_stale_sweep() -> None:
+    global _stale_sweep_started
+    with _pending_lock:
+        if _stale_sweep_started:
+            return
+        _stale_sweep_started = True
+    # One scan per process, off the critical path of the flow that started it.
+    threading.Thread(target=sweep_stage_dirs, daemon=True).start()
+
+
+def _in_use(path: Path) -> bool:
+    """True while some run (in any process) still holds `path`'s lock."""
+    if fcntl is None:
+        return True
+    try:
+        fd = os.open(path / LOCK_FILE, os.O_WRONLY)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+
+def sweep_stage_dirs(
+    max_age_seconds: float = STALE_AFTER_SECONDS, include_pending: bool = False
+) -> None:
+    """Batch-remove stale unlocked `etl_*` dirs, plus this process's finished ones."""
+    targets: set[str] = set()
+    if include_pending:
+        with _pending_lock:
+            targets.update(_pending_dirs)
+            _pending_dirs.clear()
+
+    cutoff = time.time() - max_age_seconds
+    for path in STAGE_ROOT.glob("etl_*"):
+        try:
+            if path.stat().st_mtime < cutoff and not _in_use(path):
+                targets.add(str(path))
+        except FileNotFoundError:
+            continue
+
+    for target in targets:
+        shutil.rmtree(target, ignore_errors=True)
+
+
+atexit.register(sweep_stage_dirs, include_pending=True)
@@ -3,6 +3,11 @@ import json
 
 import pandas as pd
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json accepts the same payloads
+    _json_loads = json.loads
+
 
 class TypeInferenceEngine:
     """
@@ -13,18 +18,9 @@ class TypeInferenceEngine:
     - lower thresholds detect sparse semi-structured/date columns earlier
     """
 
-    SNOWFLAKE_TYPE_MAP = {
-        "int64": "NUMBER",
-        "Int64": "NUMBER",
-        "float64": "FLOAT",
-        "Float64": "FLOAT",
-        "bool": "BOOLEAN",
-        "boolean": "BOOLEAN",
-        "datetime64[ns]": "TIMESTAMP_NTZ",
-        "object": "VARCHAR",
-        "string": "VARCHAR",
-        "str": "VARCHAR",
-    }
+    # Longest ISO timestamps (nanoseconds plus UTC offset) run to 35 characters.
+    MAX_DATE_TEXT_LENGTH = 40
+    _ISO_DATE_PATTERN = r"\d{4}-\d{2}-\d{2}"
 
     def __init__(
         self,
@@ -49,59 +45,98 @@ class TypeInferenceEngine:
             return "VARIANT"
         if self._is_date_column(series, col_name):
             return "DATE"
-        return self.SNOWFLAKE_TYPE_MAP.get(str(series.dtype), "VARCHAR")
+        return self._dtype_to_snowflake(series.dtype)
+
+    @staticmethod
+    def _dtype_to_snowflake(dtype) -> str:
+        """Map a pandas dtype (numpy or nullable extension) to a Snowflake type."""
+        types = pd.api.types
+        if types.is_bool_dtype(dtype):
+            return "BOOLEAN"
+        if types.is_integer_dtype(dtype):
+            return "NUMBER"
+        if types.is_float_dtype(dtype):
+            return "FLOAT"
+        # Naive timestamps only; tz-aware values stay VARCHAR to keep the offset.
+        if types.is_datetime64_dtype(dtype):
+            return "TIMESTAMP_NTZ"
+        return "VARCHAR"
 
     def _is_json_column(self, series: pd.Series) -> bool:
         """
         Detect whether values should be treated as semi-structured JSON payloads.
         """
         sample = series.dropna().head(self.sample_size)
-        if sample.empty:
+        if sample.empty or not pd.api.types.is_string_dtype(sample.dtype):
+            # Numeric/bool dtypes can never hold JSON text or dict/list payloads.
             return False
 
-        valid_json_values = 0
-        checked_values = 0
-
-        for val in sample:
-            if isinstance(val, (dict, list)):
-                checked_values += 1
-                valid_json_values += 1
-                continue
-
-            if not isinstance(val, str):
-                continue
-
-            stripped = val.strip()
-            if not stripped:
-                continue
-
-            checked_values += 1
-            if not (stripped.startswith("{") or stripped.startswith("[")):
-                continue
-
-            try:
-                parsed: Any = json.loads(stripped)
-            except (TypeError, json.JSONDecodeError):
-                continue
+        try:
+            # Vectorized strip; non-string values (dict/list payloads) become NaN.
+            stripped = sample.str.strip()
+        except AttributeError:  # object column holding no strings at all
+            stripped = pd.Series(pd.NA, index=sample.index, dtype="object")
+        is_text = stripped.notna()
 
-            # Restrict to object/array payloads; scalars like "1" remain VARCHAR.
-            if isinstance(parsed, (dict, list)):
-                valid_json_values += 1
+        containers = sum(
+            isinstance(val, (dict, list)) for val in sample[~is_text].tolist()
+        )
+        text = stripped[is_text]
+        text = text[text != ""]
 
+        checked_values = containers + len(text)
         if checked_values == 0:
             return False
 
+        valid_json_values = containers
+        if not text.empty:
+            # Only object/array-looking strings are worth a JSON parse attempt.
+            candidates = text[text.str.startswith("{") | text.str.startswith("[")]
+            valid_json_values += sum(
+                1 for val in candidates.tolist() if self._is_json_container(val)
+            )
         return (valid_json_values / checked_values) >= self.json_threshold
 
+    @staticmethod
+    def _is_json_container(text: str) -> bool:
+        if text[-1] not in "}]":
+            # Truncated/malformed payloads fail here without raising.
+            return False
+        try:
+            parsed: Any = _json_loads(text)
+        except (TypeError, ValueError):  # both decoders raise ValueError subclasses
+            return False
+        # Restrict to object/array payloads; scalars like "1" remain VARCHAR.
+        return isinstance(parsed, (dict, list))
+
     def _is_date_column(self, series: pd.Series, col_name: str) -> bool:
         """Classify date columns using name hint + parse ratio to reduce mis-typing."""
         if "date" not in col_name.lower():
             return False
 
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return True
+
         sample = series.dropna().head(self.sample_size)
         if sample.empty:
             return False
 
-        parsed = pd.to_datetime(sample.astype(str), errors="coerce", format="mixed")
+        if isinstance(sample.dtype, pd.StringDtype):
+            values = sample
+        else:
+            values = sample.astype(str)
+
+        # Over-long values cannot parse as dates; count them as failures and
+        # stop early once the threshold is out of reach.
+        candidates = values[values.str.len() <= self.MAX_DATE_TEXT_LENGTH]
+        if len(candidates) / len(sample) < self.date_threshold:
+            return False
+
+        # Only exact YYYY-MM-DD values take pandas' dedicated ISO8601 parser;
+        # anything else (e.g. trailing spaces read_csv keeps) stays on "mixed".
+        is_iso = candidates.str.fullmatch(self._ISO_DATE_PATTERN).all()
+        parsed = pd.to_datetime(
+            candidates, errors="coerce", format="ISO8601" if is_iso else "mixed"
+        )
         valid_ratio = parsed.notna().sum() / len(sample)
         return valid_ratio >= self.date_threshold
@@ -1,66 +1,52 @@
-from typing import List
+import sys
+from typing import Dict, List
 from prefect import task
+from prefect.cache_policies import NONE
 
 from config.settings import SnowflakeSettings
 from utils.snowflake_helpers import SnowflakeHelper
 
 
 # Runtime guardrails for ETL sanity checks, not a full data-quality framework.
-@task
+@task(cache_policy=NONE)
 def validate_row_count(
-    table_name: str, expected_min: int, sf_config: SnowflakeSettings
+    table_name: str, expected_min: int, sf_config: SnowflakeSettings, conn=None
 ) -> bool:
     """Guard against empty/near-empty loads that indicate ingestion failure."""
 
     helper = SnowflakeHelper(sf_config)
-    table_name_q = helper.qualify_name(table_name)
-
-    with helper.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name_q}")
-        count = cursor.fetchone()[0]
-
-    if count < expected_min:
-        raise ValueError(f"Row count {count} below minimum {expected_min}")
+    result = helper.validate_and_sample(
+        table_name, limit=0, expected_min=expected_min, conn=conn
+    )
 
-    print(f"Row count OK ({count})")
+    print(f"Row count OK ({result['count']})")
     return True
 
 
-@task
+@task(cache_policy=NONE)
 def validate_no_nulls(
-    table_name: str, columns: List[str], sf_config: SnowflakeSettings
+    table_name: str, columns: List[str], sf_config: SnowflakeSettings, conn=None
 ) -> bool:
     """Check required business columns for null regressions after load."""
 
     helper = SnowflakeHelper(sf_config)
-    table_name_q = helper.qualify_name(table_name)
-
-    for col in columns:
-        col_q = helper.quote_identifier(col)
-        with helper.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name_q} WHERE {col_q} IS NULL")
-            null_count = cursor.fetchone()[0]
-
-        if null_count > 0:
-            raise ValueError(f"Found {null_count} nulls in {col}")
+    result = helper.validate_and_sample(
+        table_name, limit=0, expected_min=0, null_cols=columns, conn=conn
+    )
 
+    _raise_on_nulls(result["nulls_per_col"])
     print("Null check OK")
     return True
 
 
-@task
-def sample_rows(table_name: str, limit: int, sf_config: SnowflakeSettings) -> None:
+@task(cache_policy=NONE)
+def sample_rows(
+    table_name: str, limit: int, sf_config: SnowflakeSettings, conn=None
+) -> None:
     """Print a bounded sample to verify loaded shape without full-table scans."""
 
     helper = SnowflakeHelper(sf_config)
-    table_name_q = helper.qualify_name(table_name)
-
-    with helper.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {table_name_q} LIMIT {limit}")
-        rows = cursor.fetchall()
+    rows = helper.sample_rows(table_name, limit, conn=conn)
 
     if not rows:
         print(f"Sample {table_name}: no rows")
@@ -71,9 +57,45 @@ def sample_rows(table_name: str, limit: int, sf_config: SnowflakeSettings) -> No
         print(f"  {row}")
 
 
-def _print_block(title: str, lines: List[str]) -> None:
+@task(cache_policy=NONE)
+def validate_and_sample_rows(
+    table_name: str,
+    expected_min: int,
+    limit: int,
+    sf_config: SnowflakeSettings,
+    null_cols: List[str] | None = None,
+    conn=None,
+) -> bool:
+    """Row-count and NULL guards plus bounded sample print, sharing one query."""
+
+    helper = SnowflakeHelper(sf_config)
+    result = helper.validate_and_sample(
+        table_name,
+        limit=limit,
+        expected_min=expected_min,
+        null_cols=null_cols,
+        conn=conn,
+    )
+
+    _raise_on_nulls(result["nulls_per_col"])
+    print(f"Row count OK ({result['count']})")
+    if null_cols:
+        print("Null check OK")
+    print(f"Sample {table_name} (limit {limit})")
+    for row in result["sample_rows"]:
+        print(f"  {row}")
+    return True
+
+
+def _raise_on_nulls(nulls_per_col: Dict[str, int]) -> None:
+    for col, null_count in nulls_per_col.items():
+        if null_count > 0:
+            raise ValueError(f"Found {null_count} nulls in {col}")
+
+
+def _append_block(out: List[str], title: str, lines: List[str]) -> None:
     joined = ", ".join(lines)
-    print(f"{title}: {joined}")
+    out.append(f"{title}: {joined}")
 
 
 def summarize_run(
@@ -89,8 +111,11 @@ def summarize_run(
 ) -> str:
     """Emit a compact run summary used by local operators and challenge reviewers."""
     views = views or []
+    # Buffered so the whole summary reaches stdout in one write.
+    out: List[str] = []
 
-    _print_block(
+    _append_block(
+        out,
         "Input",
         [
             f"CSV={input_file}",
@@ -102,9 +127,10 @@ def summarize_run(
     if column_count is not None:
         schema_lines.append(f"Columns inferred: {column_count}")
     if schema_lines:
-        _print_block("Schema", schema_lines)
+        _append_block(out, "Schema", schema_lines)
 
-    _print_block(
+    _append_block(
+        out,
         "Load",
         [
             f"Table={table}",
@@ -114,17 +140,20 @@ def summarize_run(
         ],
     )
 
-    _print_block(
+    _append_block(
+        out,
         "Validation",
         [f"{'passed' if validation_passed else 'not run'}"],
     )
 
-    _print_block(
+    _append_block(
+        out,
         "Subsets",
         [f"Views={', '.join(views)}" if views else "Views=none"],
     )
 
-    _print_block(
+    _append_block(
+        out,
         "Summary",
         [
             f"Table={table}",
@@ -133,4 +162,5 @@ def summarize_run(
         ],
     )
 
+    sys.stdout.write("\n".join(out) + "\n")
     return "ok"